@@ -5,36 +5,58 @@ Production-ready Model Context Protocol server for NocoDB integration,
 following the same pattern as Archon MCP server.
 """
 
-import json
+import asyncio
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 import sys
 import time
-import traceback
-from collections.abc import AsyncIterator
-from contextlib import asynccontextmanager
-from dataclasses import dataclass
-from datetime import datetime
+from collections import Counter, OrderedDict
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import aclosing, asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any
 
 import aiohttp
+import orjson
 from dotenv import load_dotenv
 from mcp.server.fastmcp import Context, FastMCP
+from yarl import URL
+
+try:
+    import uvloop
+except ImportError:  # uvloop is not available on Windows
+    uvloop = None
 
 # Load environment variables
 load_dotenv()
 
-# Configure logging with UTF-8 encoding
+# Configure logging with UTF-8 encoding. Records are queued from the event
+# loop and written to stdout/file by a listener thread, so log I/O never blocks.
+_log_handlers = [
+    logging.StreamHandler(sys.stdout),
+    logging.FileHandler("/tmp/nocodb_mcp_server.log", mode="a", encoding="utf-8")
+    if os.path.exists("/tmp")
+    else logging.NullHandler(),
+]
+for _handler in _log_handlers:
+    _handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+
+_log_queue: queue.Queue = queue.Queue(-1)
+_log_listener = logging.handlers.QueueListener(_log_queue, *_log_handlers, respect_handler_level=True)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+# The listener's handlers add timestamp/level; the queue side only merges args
 logging.basicConfig(
     level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler("/tmp/nocodb_mcp_server.log", mode="a", encoding="utf-8")
-        if os.path.exists("/tmp")
-        else logging.NullHandler(),
-    ],
+    format="%(message)s",
+    handlers=[logging.handlers.QueueHandler(_log_queue)],
 )
 logger = logging.getLogger(__name__)
 
@@ -42,29 +64,203 @@ logger = logging.getLogger(__name__)
 server_host = "0.0.0.0"
 server_port = int(os.getenv("PORT", 3001))
 
+# Fixed schema for the Discord heart reactions table, encoded once at import
+_DISCORD_TABLE_SCHEMA = {
+    "table_name": "discord_heart_reactions",
+    "title": "Discord Heart Reactions",
+    "columns": [
+        {"column_name": "message_content", "title": "Message Content", "uidt": "Text", "required": True},
+        {"column_name": "sref_code", "title": "SREF Code", "uidt": "SingleLineText"},
+        {"column_name": "image_url", "title": "Image URL", "uidt": "URL"},
+        {"column_name": "cinematic", "title": "Cinematic", "uidt": "Checkbox", "default": False},
+        {"column_name": "anime", "title": "Anime", "uidt": "Checkbox", "default": False},
+        {"column_name": "colors", "title": "Colors", "uidt": "Text"},
+        {"column_name": "shot_type", "title": "Shot Type", "uidt": "SingleLineText"},
+        {"column_name": "mood", "title": "Mood", "uidt": "SingleLineText"},
+        {"column_name": "style", "title": "Style", "uidt": "SingleLineText"},
+        {"column_name": "subject", "title": "Subject", "uidt": "Text"},
+        {"column_name": "discord_message_id", "title": "Discord Message ID", "uidt": "SingleLineText", "required": True, "unique": True},
+        {"column_name": "discord_channel_id", "title": "Discord Channel ID", "uidt": "SingleLineText", "required": True},
+        {"column_name": "timestamp", "title": "Timestamp", "uidt": "DateTime", "required": True},
+    ]
+}
+_DISCORD_TABLE_SCHEMA_BYTES = orjson.dumps(_DISCORD_TABLE_SCHEMA)
+
+
+def _dumps(obj: Any) -> str:
+    """Serialize a tool response with orjson"""
+    return orjson.dumps(obj).decode()
+
+
+_last_iso: tuple[int, str] = (0, "")
+
+
+def _now_iso() -> str:
+    """Current local time as an ISO-8601 string, formatted at most once per second"""
+    global _last_iso
+    now = int(time.time())
+    if now != _last_iso[0]:
+        _last_iso = (now, datetime.fromtimestamp(now).isoformat())
+    return _last_iso[1]
+
+
+@lru_cache(maxsize=256)
+def _encode_where_items(items: tuple) -> str:
+    return _dumps({key: value for key, value, _ in items})
+
+
+def _encode_where(filters: dict) -> str:
+    """Encode search filters for NocoDB's where parameter, memoising flat filters"""
+    try:
+        # Key on the value type too, since True == 1 would otherwise share an entry
+        return _encode_where_items(tuple((key, value, type(value)) for key, value in filters.items()))
+    except TypeError:
+        # Nested lists/dicts are unhashable; encode them directly
+        return _dumps(filters)
+
+
+async def _single_flight(pending: dict[Any, asyncio.Task], key: Any, fetch: Callable[[], Awaitable[Any]]) -> Any:
+    """Await fetch() once for all concurrent callers using the same key"""
+    task = pending.get(key)
+    if task is None:
+        # The shared fetch runs in its own task so that no caller, including the
+        # one that started it, can cancel it for the others
+        task = asyncio.ensure_future(fetch())
+        pending[key] = task
+
+        def forget(done: asyncio.Task) -> None:
+            pending.pop(key, None)
+            if not done.cancelled():
+                done.exception()  # callers re-raise it; don't log it as unretrieved if all have gone
+
+        task.add_done_callback(forget)
+    return await asyncio.shield(task)
+
+
+class TTLCache:
+    """
+    Small LRU cache whose entries expire after a fixed time-to-live.
+    """
 
-@dataclass
+    def __init__(self, ttl: float, maxsize: int = 512, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.clock = clock
+        self._entries: OrderedDict = OrderedDict()
+        self._pending: dict[Any, asyncio.Task] = {}
+
+    def get(self, key: Any) -> Any:
+        """Return the cached value for key, or None if missing or expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if self.clock() - stored_at > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Any, value: Any) -> None:
+        """Store value under key, evicting the least recently used entry when full"""
+        self._entries[key] = (self.clock(), value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Any) -> None:
+        """Drop the cached value for key, if any"""
+        self._entries.pop(key, None)
+
+    async def get_or_fetch(self, key: Any, fetch: Callable[[], Awaitable[Any]], refresh: bool = False) -> Any:
+        """
+        Return the cached value for key, or await fetch() and cache its result.
+
+        Concurrent misses for the same key share a single fetch() call.
+        """
+        if not refresh:
+            value = self.get(key)
+            if value is not None:
+                return value
+
+        async def fetch_and_store() -> Any:
+            value = await fetch()
+            self.set(key, value)
+            return value
+
+        return await _single_flight(self._pending, key, fetch_and_store)
+
+
+@dataclass(slots=True)
 class NocoDBContext:
     """
     Context for NocoDB MCP server.
     """
     nocodb_url: str
     api_token: str
-    session: Optional[aiohttp.ClientSession] = None
+    session: aiohttp.ClientSession | None = None
     startup_time: float = None
+    metadata_cache: TTLCache = field(default_factory=lambda: TTLCache(ttl=30))
+    analytics_cache: TTLCache = field(default_factory=lambda: TTLCache(ttl=10, maxsize=256))
+    base_url: URL = field(init=False)
+    meta_projects_url: URL = field(init=False)
+    data_url: URL = field(init=False)
+    bulk_data_url: URL = field(init=False)
+    inflight_requests: dict[Any, asyncio.Task] = field(default_factory=dict, repr=False)
+    server_analytics_unsupported: set[URL] = field(default_factory=set, repr=False)
 
     def __post_init__(self):
         if self.startup_time is None:
             self.startup_time = time.time()
+        self.base_url = URL(self.nocodb_url)
+        self.meta_projects_url = self.base_url / "api/v1/db/meta/projects"
+        self.data_url = self.base_url / "api/v1/db/data/noco"
+        self.bulk_data_url = self.base_url / "api/v1/db/data/bulk/noco"
 
     async def get_session(self) -> aiohttp.ClientSession:
-        """Get or create aiohttp session"""
+        """Get the shared aiohttp session, recreating it if it was closed"""
         if self.session is None or self.session.closed:
             self.session = aiohttp.ClientSession(
-                timeout=aiohttp.ClientTimeout(total=30)
+                connector=aiohttp.TCPConnector(
+                    limit=100,
+                    limit_per_host=20,
+                    keepalive_timeout=300,
+                    ttl_dns_cache=300,
+                    use_dns_cache=True,
+                    enable_cleanup_closed=True,
+                ),
+                timeout=aiohttp.ClientTimeout(total=30, connect=5, sock_read=25),
+                headers={"xc-token": self.api_token},
+                json_serialize=_dumps,
             )
         return self.session
 
+    async def fetch_json(self, url: URL, params: dict[str, Any] | None = None) -> Any:
+        """
+        GET a NocoDB endpoint and decode its JSON body.
+
+        Identical requests that are already in flight share one round-trip.
+        """
+        async def fetch() -> Any:
+            session = await self.get_session()
+            async with session.get(url, params=params) as response:
+                response.raise_for_status()
+                logger.debug("GET %s (Content-Encoding: %s)", url, response.headers.get("Content-Encoding"))
+                return orjson.loads(await response.read())
+
+        key = (url, tuple(sorted(params.items())) if params else ())
+        return await _single_flight(self.inflight_requests, key, fetch)
+
+    async def send_json(self, method: str, url: URL, body: Any = None, decode: bool = True) -> Any:
+        """Send a write request to a NocoDB endpoint and, unless decode is False, decode its JSON body."""
+        session = await self.get_session()
+        async with session.request(method, url, json=body) as response:
+            response.raise_for_status()
+            if not decode:
+                return None
+            payload = await response.read()
+            return orjson.loads(payload) if payload else None
+
     async def close_session(self):
         """Close aiohttp session"""
         if self.session and not self.session.closed:
@@ -77,6 +273,7 @@ async def lifespan(server: FastMCP) -> AsyncIterator[NocoDBContext]:
     Lifecycle manager for NocoDB MCP server
     """
     logger.info("Starting NocoDB MCP Server...")
+    context = None
 
     try:
         # Get configuration from environment
@@ -92,19 +289,21 @@ async def lifespan(server: FastMCP) -> AsyncIterator[NocoDBContext]:
             api_token=api_token
         )
 
-        logger.info(f"NocoDB URL: {context.nocodb_url}")
+        # Open the pooled session up front so every tool call reuses it
+        await context.get_session()
+
+        logger.info("NocoDB URL: %s", context.nocodb_url)
         logger.info("NocoDB MCP server ready")
 
         yield context
 
-    except Exception as e:
-        logger.error(f"Critical error in lifespan setup: {e}")
-        logger.error(traceback.format_exc())
+    except Exception:
+        logger.exception("Critical error in lifespan setup")
         raise
     finally:
         # Clean up resources
         logger.info("Cleaning up NocoDB MCP server...")
-        if hasattr(context, 'session'):
+        if context is not None:
             await context.close_session()
         logger.info("NocoDB MCP server shutdown complete")
 
@@ -117,24 +316,33 @@ MCP_INSTRUCTIONS = """
 1. **Always provide api_token** - All NocoDB operations require authentication
 2. **Use correct project_id and table_id** - Get these from list operations first
 3. **Handle pagination** - Use limit/offset for large datasets
+4. **Request only the fields you need** - Pass `fields=["Title", ...]` to get/search tools to keep responses small
 
 ## Available Tools
 
 ### Connection & Management
 - `nocodb_test_connection()` - Test NocoDB connection and list projects
-- `nocodb_list_projects()` - List all accessible projects
-- `nocodb_list_tables(project_id)` - List tables in a project
+- `nocodb_list_projects(refresh=False)` - List all accessible projects
+- `nocodb_list_tables(project_id, refresh=False)` - List tables in a project
+
+Project and table listings are cached for 30 seconds; pass `refresh=True`
+to fetch them fresh.
 
 ### Data Operations
-- `nocodb_get_records(project_id, table_id, limit=10, offset=0)` - Retrieve records
+- `nocodb_get_records(project_id, table_id, limit=10, offset=0, fields=None, sort=None)` - Retrieve records
 - `nocodb_create_record(project_id, table_id, record_data)` - Create new record
 - `nocodb_update_record(project_id, table_id, record_id, record_data)` - Update record
 - `nocodb_delete_record(project_id, table_id, record_id)` - Delete record
-- `nocodb_search_records(project_id, table_id, filters)` - Search with filters
+- `nocodb_search_records(project_id, table_id, filters, fields=None, sort=None)` - Search with filters
+
+### Bulk Operations
+- `nocodb_bulk_create_records(project_id, table_id, records)` - Create many records in one request
+- `nocodb_bulk_update_records(project_id, table_id, records)` - Update many records (each must include its primary key)
+- `nocodb_bulk_delete_records(project_id, table_id, records)` - Delete many records by primary key
 
 ### Specialized Tools
 - `nocodb_create_discord_reactions_table(project_id)` - Create Discord reactions table
-- `nocodb_get_analytics(project_id, table_id)` - Get Discord reactions analytics
+- `nocodb_get_analytics(project_id, table_id, mode="client", refresh=False)` - Get Discord reactions analytics (cached for 10 seconds); `mode="server"` tries NocoDB count/groupby queries instead of scanning every record
 
 ## Common Workflows
 
@@ -153,6 +361,7 @@ MCP_INSTRUCTIONS = """
 ## Best Practices
 - Always test connection before starting work
 - Use meaningful record data with proper field names
+- Prefer the bulk tools over repeated single-record calls when changing many records
 - Handle errors gracefully and provide user feedback
 - Use analytics tools to understand data patterns
 """
@@ -173,9 +382,8 @@ try:
     )
     logger.info("FastMCP server instance created successfully")
 
-except Exception as e:
-    logger.error(f"Failed to create FastMCP server: {e}")
-    logger.error(traceback.format_exc())
+except Exception:
+    logger.exception("Failed to create FastMCP server")
     raise
 
 
@@ -192,39 +400,38 @@ async def health_check(ctx: Context) -> str:
         context = getattr(ctx.request_context, "lifespan_context", None)
         
         if context is None:
-            return json.dumps({
+            return _dumps({
                 "success": True,
                 "status": "starting",
                 "message": "NocoDB MCP server is initializing...",
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": _now_iso(),
             })
 
         # Test NocoDB connection
         session = await context.get_session()
-        headers = {"xc-token": context.api_token}
         
         nocodb_status = "unknown"
         try:
-            async with session.get(f"{context.nocodb_url}/api/v1/db/meta/projects", headers=headers) as response:
+            async with session.get(context.meta_projects_url) as response:
                 nocodb_status = "healthy" if response.status == 200 else "unhealthy"
         except Exception as e:
             nocodb_status = f"error: {str(e)}"
 
-        return json.dumps({
+        return _dumps({
             "success": True,
             "status": "healthy",
             "nocodb_status": nocodb_status,
             "uptime_seconds": time.time() - context.startup_time,
             "nocodb_url": context.nocodb_url,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": _now_iso(),
         })
 
     except Exception as e:
-        logger.error(f"Health check failed: {e}")
-        return json.dumps({
+        logger.exception("Health check failed")
+        return _dumps({
             "success": False,
             "error": f"Health check failed: {str(e)}",
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": _now_iso(),
         })
 
 
@@ -238,103 +445,108 @@ async def nocodb_test_connection(ctx: Context) -> str:
         JSON with connection status and project list
     """
     try:
-        context = getattr(ctx.request_context, "lifespan_context")
+        context = ctx.request_context.lifespan_context
         session = await context.get_session()
-        headers = {"xc-token": context.api_token}
 
-        async with session.get(f"{context.nocodb_url}/api/v1/db/meta/projects", headers=headers) as response:
+        async with session.get(context.meta_projects_url) as response:
             if response.status != 200:
                 error_text = await response.text()
-                return json.dumps({
+                return _dumps({
                     "success": False,
                     "error": f"Connection failed with status {response.status}: {error_text}",
                 })
 
-            projects = await response.json()
-            return json.dumps({
+            projects = orjson.loads(await response.read())
+            return _dumps({
                 "success": True,
                 "message": "Connection successful",
                 "projects_count": len(projects.get("list", [])),
                 "projects": projects,
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": _now_iso(),
             })
 
     except Exception as e:
-        logger.error(f"NocoDB connection test failed: {e}")
-        return json.dumps({
+        logger.exception("NocoDB connection test failed")
+        return _dumps({
             "success": False,
             "error": f"Connection test failed: {str(e)}",
         })
 
 
 @mcp.tool()
-async def nocodb_list_projects(ctx: Context) -> str:
+async def nocodb_list_projects(ctx: Context, refresh: bool = False) -> str:
     """
     List all projects in NocoDB.
     
+    Args:
+        refresh: Bypass the short-lived metadata cache (default: False)
+
     Returns:
         JSON with list of projects
     """
     try:
-        context = getattr(ctx.request_context, "lifespan_context")
-        session = await context.get_session()
-        headers = {"xc-token": context.api_token}
+        context = ctx.request_context.lifespan_context
+        url = context.meta_projects_url
 
-        async with session.get(f"{context.nocodb_url}/api/v1/db/meta/projects", headers=headers) as response:
-            response.raise_for_status()
-            data = await response.json()
-            
-            return json.dumps({
-                "success": True,
-                "projects": data,
-                "timestamp": datetime.now().isoformat(),
-            })
+        data = await context.metadata_cache.get_or_fetch(url, lambda: context.fetch_json(url), refresh)
+
+        return _dumps({
+            "success": True,
+            "projects": data,
+            "timestamp": _now_iso(),
+        })
 
     except Exception as e:
-        logger.error(f"List projects failed: {e}")
-        return json.dumps({
+        logger.exception("List projects failed")
+        return _dumps({
             "success": False,
             "error": f"Failed to list projects: {str(e)}",
         })
 
 
 @mcp.tool()
-async def nocodb_list_tables(ctx: Context, project_id: str) -> str:
+async def nocodb_list_tables(ctx: Context, project_id: str, refresh: bool = False) -> str:
     """
     List tables in a NocoDB project.
     
     Args:
         project_id: The project ID to list tables from
+        refresh: Bypass the short-lived metadata cache (default: False)
         
     Returns:
         JSON with list of tables in the project
     """
     try:
-        context = getattr(ctx.request_context, "lifespan_context")
-        session = await context.get_session()
-        headers = {"xc-token": context.api_token}
+        context = ctx.request_context.lifespan_context
+        url = context.meta_projects_url / project_id / "tables"
 
-        async with session.get(f"{context.nocodb_url}/api/v1/db/meta/projects/{project_id}/tables", headers=headers) as response:
-            response.raise_for_status()
-            data = await response.json()
-            
-            return json.dumps({
-                "success": True,
-                "project_id": project_id,
-                "tables": data,
-                "timestamp": datetime.now().isoformat(),
-            })
+        data = await context.metadata_cache.get_or_fetch(url, lambda: context.fetch_json(url), refresh)
+
+        return _dumps({
+            "success": True,
+            "project_id": project_id,
+            "tables": data,
+            "timestamp": _now_iso(),
+        })
 
     except Exception as e:
-        logger.error(f"List tables failed: {e}")
-        return json.dumps({
+        logger.exception("List tables failed")
+        return _dumps({
             "success": False,
             "error": f"Failed to list tables: {str(e)}",
         })
 
 
 @mcp.tool()
-async def nocodb_get_records(ctx: Context, project_id: str, table_id: str, limit: int = 10, offset: int = 0) -> str:
+async def nocodb_get_records(
+    ctx: Context,
+    project_id: str,
+    table_id: str,
+    limit: int = 10,
+    offset: int = 0,
+    fields: list[str] | None = None,
+    sort: str | None = None,
+) -> str:
     """
     Get records from a NocoDB table.
     
@@ -343,36 +555,34 @@ async def nocodb_get_records(ctx: Context, project_id: str, table_id: str, limit
         table_id: The table ID
         limit: Maximum number of records to return (default: 10)
         offset: Number of records to skip (default: 0)
+        fields: Only return these fields of each record (default: all fields)
+        sort: Field to sort by, prefixed with "-" for descending order (e.g. "-timestamp")
         
     Returns:
         JSON with records from the table
     """
     try:
-        context = getattr(ctx.request_context, "lifespan_context")
-        session = await context.get_session()
-        headers = {"xc-token": context.api_token}
+        context = ctx.request_context.lifespan_context
         
         params = {"limit": limit, "offset": offset}
+        if fields:
+            params["fields"] = ",".join(fields)
+        if sort:
+            params["sort"] = sort
 
-        async with session.get(
-            f"{context.nocodb_url}/api/v1/db/data/noco/{project_id}/{table_id}",
-            headers=headers,
-            params=params
-        ) as response:
-            response.raise_for_status()
-            data = await response.json()
-            
-            return json.dumps({
-                "success": True,
-                "project_id": project_id,
-                "table_id": table_id,
-                "records": data,
-                "timestamp": datetime.now().isoformat(),
-            })
+        data = await context.fetch_json(context.data_url / project_id / table_id, params)
+
+        return _dumps({
+            "success": True,
+            "project_id": project_id,
+            "table_id": table_id,
+            "records": data,
+            "timestamp": _now_iso(),
+        })
 
     except Exception as e:
-        logger.error(f"Get records failed: {e}")
-        return json.dumps({
+        logger.exception("Get records failed")
+        return _dumps({
             "success": False,
             "error": f"Failed to get records: {str(e)}",
         })
@@ -392,29 +602,20 @@ async def nocodb_create_record(ctx: Context, project_id: str, table_id: str, rec
         JSON with the created record
     """
     try:
-        context = getattr(ctx.request_context, "lifespan_context")
-        session = await context.get_session()
-        headers = {"xc-token": context.api_token, "Content-Type": "application/json"}
+        context = ctx.request_context.lifespan_context
+        data = await context.send_json("POST", context.data_url / project_id / table_id, record_data)
 
-        async with session.post(
-            f"{context.nocodb_url}/api/v1/db/data/noco/{project_id}/{table_id}",
-            headers=headers,
-            json=record_data
-        ) as response:
-            response.raise_for_status()
-            data = await response.json()
-            
-            return json.dumps({
-                "success": True,
-                "project_id": project_id,
-                "table_id": table_id,
-                "record": data,
-                "timestamp": datetime.now().isoformat(),
-            })
+        return _dumps({
+            "success": True,
+            "project_id": project_id,
+            "table_id": table_id,
+            "record": data,
+            "timestamp": _now_iso(),
+        })
 
     except Exception as e:
-        logger.error(f"Create record failed: {e}")
-        return json.dumps({
+        logger.exception("Create record failed")
+        return _dumps({
             "success": False,
             "error": f"Failed to create record: {str(e)}",
         })
@@ -435,30 +636,21 @@ async def nocodb_update_record(ctx: Context, project_id: str, table_id: str, rec
         JSON with the updated record
     """
     try:
-        context = getattr(ctx.request_context, "lifespan_context")
-        session = await context.get_session()
-        headers = {"xc-token": context.api_token, "Content-Type": "application/json"}
+        context = ctx.request_context.lifespan_context
+        data = await context.send_json("PATCH", context.data_url / project_id / table_id / record_id, record_data)
 
-        async with session.patch(
-            f"{context.nocodb_url}/api/v1/db/data/noco/{project_id}/{table_id}/{record_id}",
-            headers=headers,
-            json=record_data
-        ) as response:
-            response.raise_for_status()
-            data = await response.json()
-            
-            return json.dumps({
-                "success": True,
-                "project_id": project_id,
-                "table_id": table_id,
-                "record_id": record_id,
-                "record": data,
-                "timestamp": datetime.now().isoformat(),
-            })
+        return _dumps({
+            "success": True,
+            "project_id": project_id,
+            "table_id": table_id,
+            "record_id": record_id,
+            "record": data,
+            "timestamp": _now_iso(),
+        })
 
     except Exception as e:
-        logger.error(f"Update record failed: {e}")
-        return json.dumps({
+        logger.exception("Update record failed")
+        return _dumps({
             "success": False,
             "error": f"Failed to update record: {str(e)}",
         })
@@ -478,35 +670,138 @@ async def nocodb_delete_record(ctx: Context, project_id: str, table_id: str, rec
         JSON with deletion confirmation
     """
     try:
-        context = getattr(ctx.request_context, "lifespan_context")
-        session = await context.get_session()
-        headers = {"xc-token": context.api_token}
+        context = ctx.request_context.lifespan_context
+        await context.send_json("DELETE", context.data_url / project_id / table_id / record_id, decode=False)
 
-        async with session.delete(
-            f"{context.nocodb_url}/api/v1/db/data/noco/{project_id}/{table_id}/{record_id}",
-            headers=headers
-        ) as response:
-            response.raise_for_status()
-            
-            return json.dumps({
-                "success": True,
-                "project_id": project_id,
-                "table_id": table_id,
-                "record_id": record_id,
-                "message": "Record deleted successfully",
-                "timestamp": datetime.now().isoformat(),
-            })
+        return _dumps({
+            "success": True,
+            "project_id": project_id,
+            "table_id": table_id,
+            "record_id": record_id,
+            "message": "Record deleted successfully",
+            "timestamp": _now_iso(),
+        })
 
     except Exception as e:
-        logger.error(f"Delete record failed: {e}")
-        return json.dumps({
+        logger.exception("Delete record failed")
+        return _dumps({
             "success": False,
             "error": f"Failed to delete record: {str(e)}",
         })
 
 
 @mcp.tool()
-async def nocodb_search_records(ctx: Context, project_id: str, table_id: str, filters: dict) -> str:
+async def nocodb_bulk_create_records(ctx: Context, project_id: str, table_id: str, records: list[dict]) -> str:
+    """
+    Create several records in a NocoDB table with a single request.
+
+    Args:
+        project_id: The project ID
+        table_id: The table ID
+        records: List of dictionaries with field names and values, one per new record
+
+    Returns:
+        JSON with the created records
+    """
+    try:
+        context = ctx.request_context.lifespan_context
+        data = await context.send_json("POST", context.bulk_data_url / project_id / table_id, records)
+
+        return _dumps({
+            "success": True,
+            "project_id": project_id,
+            "table_id": table_id,
+            "count": len(records),
+            "records": data,
+            "timestamp": _now_iso(),
+        })
+
+    except Exception as e:
+        logger.exception("Bulk create records failed")
+        return _dumps({
+            "success": False,
+            "error": f"Failed to bulk create records: {str(e)}",
+        })
+
+
+@mcp.tool()
+async def nocodb_bulk_update_records(ctx: Context, project_id: str, table_id: str, records: list[dict]) -> str:
+    """
+    Update several records in a NocoDB table with a single request.
+
+    Args:
+        project_id: The project ID
+        table_id: The table ID
+        records: List of dictionaries with new field values, each including the record's primary key (e.g. "Id")
+
+    Returns:
+        JSON with the bulk update result
+    """
+    try:
+        context = ctx.request_context.lifespan_context
+        data = await context.send_json("PATCH", context.bulk_data_url / project_id / table_id, records)
+
+        return _dumps({
+            "success": True,
+            "project_id": project_id,
+            "table_id": table_id,
+            "count": len(records),
+            "result": data,
+            "timestamp": _now_iso(),
+        })
+
+    except Exception as e:
+        logger.exception("Bulk update records failed")
+        return _dumps({
+            "success": False,
+            "error": f"Failed to bulk update records: {str(e)}",
+        })
+
+
+@mcp.tool()
+async def nocodb_bulk_delete_records(ctx: Context, project_id: str, table_id: str, records: list[dict]) -> str:
+    """
+    Delete several records from a NocoDB table with a single request.
+
+    Args:
+        project_id: The project ID
+        table_id: The table ID
+        records: List of dictionaries with the primary key of each record to delete (e.g. {"Id": 1})
+
+    Returns:
+        JSON with deletion confirmation
+    """
+    try:
+        context = ctx.request_context.lifespan_context
+        data = await context.send_json("DELETE", context.bulk_data_url / project_id / table_id, records)
+
+        return _dumps({
+            "success": True,
+            "project_id": project_id,
+            "table_id": table_id,
+            "count": len(records),
+            "result": data,
+            "message": "Records deleted successfully",
+            "timestamp": _now_iso(),
+        })
+
+    except Exception as e:
+        logger.exception("Bulk delete records failed")
+        return _dumps({
+            "success": False,
+            "error": f"Failed to bulk delete records: {str(e)}",
+        })
+
+
+@mcp.tool()
+async def nocodb_search_records(
+    ctx: Context,
+    project_id: str,
+    table_id: str,
+    filters: dict,
+    fields: list[str] | None = None,
+    sort: str | None = None,
+) -> str:
     """
     Search records in a NocoDB table with filters.
     
@@ -514,37 +809,35 @@ async def nocodb_search_records(ctx: Context, project_id: str, table_id: str, fi
         project_id: The project ID
         table_id: The table ID
         filters: Dictionary with search filters
+        fields: Only return these fields of each record (default: all fields)
+        sort: Field to sort by, prefixed with "-" for descending order (e.g. "-timestamp")
         
     Returns:
         JSON with matching records
     """
     try:
-        context = getattr(ctx.request_context, "lifespan_context")
-        session = await context.get_session()
-        headers = {"xc-token": context.api_token}
+        context = ctx.request_context.lifespan_context
         
-        params = {"where": json.dumps(filters)}
+        params = {"where": _encode_where(filters)}
+        if fields:
+            params["fields"] = ",".join(fields)
+        if sort:
+            params["sort"] = sort
 
-        async with session.get(
-            f"{context.nocodb_url}/api/v1/db/data/noco/{project_id}/{table_id}",
-            headers=headers,
-            params=params
-        ) as response:
-            response.raise_for_status()
-            data = await response.json()
-            
-            return json.dumps({
-                "success": True,
-                "project_id": project_id,
-                "table_id": table_id,
-                "filters": filters,
-                "records": data,
-                "timestamp": datetime.now().isoformat(),
-            })
+        data = await context.fetch_json(context.data_url / project_id / table_id, params)
+
+        return _dumps({
+            "success": True,
+            "project_id": project_id,
+            "table_id": table_id,
+            "filters": filters,
+            "records": data,
+            "timestamp": _now_iso(),
+        })
 
     except Exception as e:
-        logger.error(f"Search records failed: {e}")
-        return json.dumps({
+        logger.exception("Search records failed")
+        return _dumps({
             "success": False,
             "error": f"Failed to search records: {str(e)}",
         })
@@ -562,126 +855,277 @@ async def nocodb_create_discord_reactions_table(ctx: Context, project_id: str) -
         JSON with the created table information
     """
     try:
-        context = getattr(ctx.request_context, "lifespan_context")
+        context = ctx.request_context.lifespan_context
         session = await context.get_session()
-        headers = {"xc-token": context.api_token, "Content-Type": "application/json"}
-
-        table_schema = {
-            "table_name": "discord_heart_reactions",
-            "title": "Discord Heart Reactions",
-            "columns": [
-                {"column_name": "message_content", "title": "Message Content", "uidt": "Text", "required": True},
-                {"column_name": "sref_code", "title": "SREF Code", "uidt": "SingleLineText"},
-                {"column_name": "image_url", "title": "Image URL", "uidt": "URL"},
-                {"column_name": "cinematic", "title": "Cinematic", "uidt": "Checkbox", "default": False},
-                {"column_name": "anime", "title": "Anime", "uidt": "Checkbox", "default": False},
-                {"column_name": "colors", "title": "Colors", "uidt": "Text"},
-                {"column_name": "shot_type", "title": "Shot Type", "uidt": "SingleLineText"},
-                {"column_name": "mood", "title": "Mood", "uidt": "SingleLineText"},
-                {"column_name": "style", "title": "Style", "uidt": "SingleLineText"},
-                {"column_name": "subject", "title": "Subject", "uidt": "Text"},
-                {"column_name": "discord_message_id", "title": "Discord Message ID", "uidt": "SingleLineText", "required": True, "unique": True},
-                {"column_name": "discord_channel_id", "title": "Discord Channel ID", "uidt": "SingleLineText", "required": True},
-                {"column_name": "timestamp", "title": "Timestamp", "uidt": "DateTime", "required": True}
-            ]
-        }
+        tables_url = context.meta_projects_url / project_id / "tables"
 
         async with session.post(
-            f"{context.nocodb_url}/api/v1/db/meta/projects/{project_id}/tables",
-            headers=headers,
-            json=table_schema
+            tables_url,
+            headers={"Content-Type": "application/json"},
+            data=_DISCORD_TABLE_SCHEMA_BYTES
         ) as response:
             response.raise_for_status()
-            data = await response.json()
+            data = orjson.loads(await response.read())
+            context.metadata_cache.invalidate(tables_url)
             
-            return json.dumps({
+            return _dumps({
                 "success": True,
                 "project_id": project_id,
                 "table": data,
                 "message": "Discord Heart Reactions table created successfully",
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": _now_iso(),
             })
 
     except Exception as e:
-        logger.error(f"Create Discord reactions table failed: {e}")
-        return json.dumps({
+        logger.exception("Create Discord reactions table failed")
+        return _dumps({
             "success": False,
             "error": f"Failed to create Discord reactions table: {str(e)}",
         })
 
 
+# Client-side analytics scans the whole table in concurrent pages, requesting
+# only the columns that _aggregate_analytics reads
+_ANALYTICS_PAGE_SIZE = 200
+_ANALYTICS_MAX_CONCURRENT_PAGES = 4
+_ANALYTICS_FIELDS = "image_url,cinematic,anime,sref_code,shot_type,timestamp"
+
+
+async def _iter_record_pages(
+    context: NocoDBContext, url: URL, fields: str, where: str | None = None
+) -> AsyncIterator[list]:
+    """
+    Yield every page of records in a table, or those matching where, as it arrives.
+
+    Pages after the first are requested concurrently, so callers can consume
+    each one and drop it instead of holding the whole table in memory.
+    """
+    params = {"limit": _ANALYTICS_PAGE_SIZE, "offset": 0, "fields": fields}
+    if where:
+        params["where"] = where
+    first_page = await context.fetch_json(url, params)
+    records = first_page.get("list", [])
+    total_rows = first_page.get("pageInfo", {}).get("totalRows", len(records))
+    yield records
+    if not records or len(records) >= total_rows:
+        return
+
+    # NocoDB may cap the page size below what we asked for; step by what it returned
+    page_size = len(records)
+    semaphore = asyncio.Semaphore(_ANALYTICS_MAX_CONCURRENT_PAGES)
+
+    async def fetch_page(offset: int) -> list:
+        async with semaphore:
+            page = await context.fetch_json(url, {**params, "limit": page_size, "offset": offset})
+            return page.get("list", [])
+
+    tasks = [asyncio.create_task(fetch_page(offset)) for offset in range(page_size, total_rows, page_size)]
+    try:
+        for next_page in asyncio.as_completed(tasks):
+            yield await next_page
+    finally:
+        # This only drops pages still waiting for the semaphore: fetch_json shares
+        # shielded requests, so the few already in flight run to completion
+        for task in tasks:
+            task.cancel()
+        # Retrieve every outcome so failed pages are not logged as unretrieved
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _aggregate_analytics(records: list, cutoff: float) -> dict[str, Any]:
+    """Calculate Discord reactions analytics in a single pass over the records"""
+    cutoff_str = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(cutoff))
+    with_images = cinematic = anime = with_sref = recent = 0
+    shot_types = Counter()
+
+    for record in records:
+        if record.get("image_url"):
+            with_images += 1
+        if record.get("cinematic"):
+            cinematic += 1
+        if record.get("anime"):
+            anime += 1
+        if record.get("sref_code"):
+            with_sref += 1
+
+        # Shot type breakdown
+        shot_type = record.get("shot_type")
+        if shot_type:
+            shot_types[shot_type] += 1
+
+        # Recent activity (24 hours). NocoDB returns DateTime values as
+        # UTC ISO-8601 strings ("2024-01-01T12:00:00.000Z"), which sort
+        # lexicographically, so compare those against the cutoff string
+        # directly and only parse timestamps in any other format.
+        timestamp = record.get("timestamp")
+        if timestamp:
+            try:
+                if timestamp[10:11] == "T" and timestamp.endswith(("Z", "+00:00")):
+                    is_recent = timestamp[:19] > cutoff_str
+                else:
+                    record_time = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+                    if record_time.tzinfo is None:
+                        record_time = record_time.replace(tzinfo=UTC)
+                    is_recent = record_time.timestamp() > cutoff
+                if is_recent:
+                    recent += 1
+            except (ValueError, AttributeError, TypeError):
+                pass
+
+    return {
+        "total_reactions": len(records),
+        "with_images": with_images,
+        "cinematic_count": cinematic,
+        "anime_count": anime,
+        "with_sref_codes": with_sref,
+        "shot_types": dict(shot_types),
+        "recent_24h": recent
+    }
+
+
+def _merge_analytics(analytics: dict[str, Any], partial: dict[str, Any]) -> dict[str, Any]:
+    """Add the counts of one page's analytics into the running totals"""
+    for key, value in partial.items():
+        if key == "shot_types":
+            shot_types = analytics["shot_types"]
+            for shot_type, count in value.items():
+                shot_types[shot_type] = shot_types.get(shot_type, 0) + count
+        else:
+            analytics[key] += value
+    return analytics
+
+
+async def _scan_analytics(context: NocoDBContext, url: URL) -> dict[str, Any]:
+    """Compute Discord reactions analytics by scanning every record, one page at a time"""
+    cutoff = time.time() - 24 * 60 * 60
+    analytics = None
+    # Close the page iterator even if aggregation raises, so pending page fetches stop
+    async with aclosing(_iter_record_pages(context, url, _ANALYTICS_FIELDS)) as pages:
+        async for records in pages:
+            # A page is at most a few hundred rows, cheaper to count here than to hand to a thread
+            partial = _aggregate_analytics(records, cutoff)
+            analytics = partial if analytics is None else _merge_analytics(analytics, partial)
+    return analytics
+
+
+async def _count_records(context: NocoDBContext, url: URL, where: str | None = None) -> int:
+    """Count the records of a table matching an optional NocoDB where clause"""
+    data = await context.fetch_json(url / "count", {"where": where} if where else None)
+    return data.get("count", 0)
+
+
+async def _count_recent_records(context: NocoDBContext, url: URL, cutoff: float) -> int:
+    """Count the records whose timestamp is after cutoff"""
+    # NocoDB date filters only compare whole dates, so narrow the rows down on the
+    # server (with a day of slack for its timezone) and apply the exact cutoff here
+    since = time.strftime("%Y-%m-%d", time.gmtime(cutoff - 24 * 60 * 60))
+    recent = 0
+    async with aclosing(
+        _iter_record_pages(context, url, "timestamp", f"(timestamp,gte,exactDate,{since})")
+    ) as pages:
+        async for records in pages:
+            recent += _aggregate_analytics(records, cutoff)["recent_24h"]
+    return recent
+
+
+async def _fetch_server_analytics(context: NocoDBContext, url: URL) -> dict[str, Any]:
+    """Compute Discord reactions analytics with NocoDB count/groupby queries instead of a full scan"""
+    cutoff = time.time() - 24 * 60 * 60
+    total, with_images, cinematic, anime, with_sref, recent, shot_type_groups = await asyncio.gather(
+        _count_records(context, url),
+        _count_records(context, url, "(image_url,notblank)"),
+        _count_records(context, url, "(cinematic,checked)"),
+        _count_records(context, url, "(anime,checked)"),
+        _count_records(context, url, "(sref_code,notblank)"),
+        _count_recent_records(context, url, cutoff),
+        context.fetch_json(url / "groupby", {"column_name": "shot_type", "limit": 1000}),
+    )
+
+    return {
+        "total_reactions": total,
+        "with_images": with_images,
+        "cinematic_count": cinematic,
+        "anime_count": anime,
+        "with_sref_codes": with_sref,
+        "shot_types": {
+            group["shot_type"]: group.get("count", 0)
+            for group in shot_type_groups.get("list", [])
+            if group.get("shot_type")
+        },
+        "recent_24h": recent
+    }
+
+
+def _summarize_analytics(analytics: dict[str, Any]) -> dict[str, Any]:
+    """Build the human-readable summary for an analytics result"""
+    total = analytics["total_reactions"]
+
+    def percentage(count: int) -> float:
+        return round(count / total * 100, 1) if total > 0 else 0
+
+    return {
+        "message": f"{total} total reactions, {analytics['with_images']} with images, {analytics['recent_24h']} in last 24h",
+        "cinematic_percentage": percentage(analytics["cinematic_count"]),
+        "anime_percentage": percentage(analytics["anime_count"]),
+        "sref_coverage": percentage(analytics["with_sref_codes"]),
+    }
+
+
 @mcp.tool()
-async def nocodb_get_analytics(ctx: Context, project_id: str, table_id: str) -> str:
+async def nocodb_get_analytics(
+    ctx: Context, project_id: str, table_id: str, mode: str = "client", refresh: bool = False
+) -> str:
     """
     Get Discord reactions analytics from a table.
     
     Args:
         project_id: The project ID
         table_id: The table ID (should be Discord reactions table)
+        mode: "client" to fetch and scan every record, or "server" to try
+            NocoDB count/groupby queries first (default: "client")
+        refresh: Bypass the short-lived analytics cache, and retry server mode if
+            NocoDB rejected it before (default: False)
         
     Returns:
         JSON with analytics data and summary
     """
     try:
-        context = getattr(ctx.request_context, "lifespan_context")
-        session = await context.get_session()
-        headers = {"xc-token": context.api_token}
-
-        # Get all records for analytics
-        async with session.get(
-            f"{context.nocodb_url}/api/v1/db/data/noco/{project_id}/{table_id}?limit=1000",
-            headers=headers
-        ) as response:
-            response.raise_for_status()
-            data = await response.json()
-            records = data.get("list", [])
-
-            # Calculate analytics
-            analytics = {
-                "total_reactions": len(records),
-                "with_images": len([r for r in records if r.get("image_url")]),
-                "cinematic_count": len([r for r in records if r.get("cinematic")]),
-                "anime_count": len([r for r in records if r.get("anime")]),
-                "with_sref_codes": len([r for r in records if r.get("sref_code")]),
-                "shot_types": {},
-                "recent_24h": 0
-            }
-
-            # Shot type breakdown
-            for record in records:
-                if record.get("shot_type"):
-                    shot_type = record["shot_type"]
-                    analytics["shot_types"][shot_type] = analytics["shot_types"].get(shot_type, 0) + 1
-
-            # Recent activity (24 hours)
-            from datetime import timedelta
-            cutoff = datetime.now() - timedelta(hours=24)
-            for record in records:
-                if record.get("timestamp"):
-                    try:
-                        record_time = datetime.fromisoformat(record["timestamp"].replace('Z', '+00:00'))
-                        if record_time > cutoff:
-                            analytics["recent_24h"] += 1
-                    except (ValueError, AttributeError):
-                        pass
-
-            return json.dumps({
-                "success": True,
-                "project_id": project_id,
-                "table_id": table_id,
-                "analytics": analytics,
-                "summary": {
-                    "message": f"{analytics['total_reactions']} total reactions, {analytics['with_images']} with images, {analytics['recent_24h']} in last 24h",
-                    "cinematic_percentage": round((analytics['cinematic_count'] / analytics['total_reactions']) * 100, 1) if analytics['total_reactions'] > 0 else 0,
-                    "anime_percentage": round((analytics['anime_count'] / analytics['total_reactions']) * 100, 1) if analytics['total_reactions'] > 0 else 0,
-                    "sref_coverage": round((analytics['with_sref_codes'] / analytics['total_reactions']) * 100, 1) if analytics['total_reactions'] > 0 else 0
-                },
-                "timestamp": datetime.now().isoformat(),
-            })
+        if mode not in ("server", "client"):
+            raise ValueError(f"mode must be 'server' or 'client', got {mode!r}")
+
+        context = ctx.request_context.lifespan_context
+        url = context.data_url / project_id / table_id
+        if refresh:
+            context.server_analytics_unsupported.discard(url)
+
+        async def fetch_analytics() -> dict[str, Any]:
+            if mode == "server" and url not in context.server_analytics_unsupported:
+                try:
+                    return await _fetch_server_analytics(context, url)
+                except aiohttp.ClientResponseError as e:
+                    # Some NocoDB versions reject these filters; remember that so later
+                    # calls go straight to the scan. Auth and not-found errors are not
+                    # about the filters, so those are retried.
+                    if e.status in (400, 422):
+                        context.server_analytics_unsupported.add(url)
+                    logger.warning("Server-side analytics failed, scanning records instead: %s", e)
+
+            return await _scan_analytics(context, url)
+
+        analytics = await context.analytics_cache.get_or_fetch((url, mode), fetch_analytics, refresh)
+
+        return _dumps({
+            "success": True,
+            "project_id": project_id,
+            "table_id": table_id,
+            "analytics": analytics,
+            "summary": _summarize_analytics(analytics),
+            "timestamp": _now_iso(),
+        })
 
     except Exception as e:
-        logger.error(f"Get analytics failed: {e}")
-        return json.dumps({
+        logger.exception("Get analytics failed")
+        return _dumps({
             "success": False,
             "error": f"Failed to get analytics: {str(e)}",
         })
@@ -692,14 +1136,20 @@ def main():
     try:
         logger.info("Starting NocoDB MCP Server")
         logger.info("   Mode: Streamable HTTP")
-        logger.info(f"   URL: http://{server_host}:{server_port}/")
+        logger.info("   URL: http://%s:%s/", server_host, server_port)
+
+        # FastMCP runs uvicorn inside anyio.run(), so uvicorn never installs
+        # uvloop itself; set the policy before the loop is created. The
+        # httptools parser is picked up by uvicorn automatically when installed.
+        if uvloop is not None:
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+            logger.info("   Event loop: uvloop")
         
         # Run with streamable-http transport
         mcp.run(transport="streamable-http")
 
-    except Exception as e:
-        logger.error(f"Fatal error in main: {e}")
-        logger.error(traceback.format_exc())
+    except Exception:
+        logger.exception("Fatal error in main")
         raise
 
 
@@ -708,7 +1158,6 @@ if __name__ == "__main__":
         main()
     except KeyboardInterrupt:
         logger.info("NocoDB MCP server stopped by user")
-    except Exception as e:
-        logger.error(f"Unhandled exception: {e}")
-        logger.error(traceback.format_exc())
+    except Exception:
+        logger.exception("Unhandled exception")
         sys.exit(1)
\ No newline at end of file
@@ -0,0 +1,388 @@
+"""Tests for nocodb_mcp_server"""
+import asyncio
+import json
+import time
+from datetime import UTC, datetime
+from types import SimpleNamespace
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import nocodb_mcp_server as server
+from nocodb_mcp_server import NocoDBContext, TTLCache
+
+ROWS = [{"Id": i} for i in range(120)]
+
+
+class FakeClock:
+    """Manually advanced stand-in for time.monotonic"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class MockNocoDB:
+    """Minimal NocoDB data API that records every request it receives"""
+
+    def __init__(self):
+        self.requests = []
+        self.delay = 0.0
+        self.fail_offsets = set()
+        self.max_page_size = None
+        self.rows = ROWS
+        self.count_status = 200
+
+    async def handle(self, request: web.Request) -> web.Response:
+        body = await request.json() if request.can_read_body else None
+        self.requests.append((request.method, request.rel_url, body))
+        await asyncio.sleep(self.delay)
+        if request.method == "DELETE" and body is None:
+            return web.Response(text="Deleted")
+        if request.method != "GET":
+            return web.json_response(body)
+        if request.path.endswith("/count"):
+            if self.count_status != 200:
+                return web.json_response({"msg": "rejected"}, status=self.count_status)
+            return web.json_response({"count": len(self.rows)})
+        if request.path.endswith("/groupby"):
+            return web.json_response({"list": [{"shot_type": "wide", "count": 2}, {"shot_type": None, "count": 1}]})
+
+        rows = self.rows
+        where = request.query.get("where", "")
+        if where.startswith("(timestamp,gte,exactDate,"):
+            since = where.rstrip(")").rsplit(",", 1)[1]
+            rows = [row for row in rows if row["timestamp"][:10] >= since]
+
+        offset = int(request.query.get("offset", 0))
+        if offset in self.fail_offsets:
+            return web.json_response({"msg": "boom"}, status=500)
+        limit = int(request.query.get("limit", 25))
+        if self.max_page_size is not None:
+            limit = min(limit, self.max_page_size)
+        return web.json_response({
+            "list": rows[offset:offset + limit],
+            "pageInfo": {"totalRows": len(rows), "pageSize": limit},
+        })
+
+
+@pytest.fixture
+async def nocodb():
+    mock = MockNocoDB()
+    app = web.Application()
+    app.router.add_route("*", "/{tail:.*}", mock.handle)
+    test_server = TestServer(app)
+    await test_server.start_server()
+    mock.url = str(test_server.make_url("/"))
+    yield mock
+    await test_server.close()
+
+
+@pytest.fixture
+async def context(nocodb):
+    context = NocoDBContext(nocodb_url=nocodb.url.rstrip("/"), api_token="token")
+    yield context
+    await context.close_session()
+
+
+def tool_context(context: NocoDBContext) -> SimpleNamespace:
+    """The slice of an MCP request Context that the tools read"""
+    return SimpleNamespace(request_context=SimpleNamespace(lifespan_context=context))
+
+
+async def test_ttl_cache_expires_and_refreshes():
+    clock = FakeClock()
+    cache = TTLCache(ttl=30, clock=clock)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return len(calls)
+
+    assert await cache.get_or_fetch("k", fetch) == 1
+    assert await cache.get_or_fetch("k", fetch) == 1
+    assert await cache.get_or_fetch("k", fetch, refresh=True) == 2
+
+    clock.now += 31
+    assert await cache.get_or_fetch("k", fetch) == 3
+    assert len(calls) == 3
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(ttl=30, maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+async def test_ttl_cache_coalesces_concurrent_misses():
+    cache = TTLCache(ttl=30)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    results = await asyncio.gather(*(cache.get_or_fetch("k", fetch) for _ in range(5)))
+
+    assert results == ["value"] * 5
+    assert len(calls) == 1
+
+
+async def test_concurrent_identical_gets_share_one_request(nocodb, context):
+    nocodb.delay = 0.05
+    url = context.data_url / "p1" / "t1"
+
+    results = await asyncio.gather(*(context.fetch_json(url, {"limit": 5, "offset": 0}) for _ in range(5)))
+
+    assert len(nocodb.requests) == 1
+    assert all(result == results[0] for result in results)
+    assert context.inflight_requests == {}
+
+
+async def test_different_params_are_not_coalesced(nocodb, context):
+    url = context.data_url / "p1" / "t1"
+
+    await asyncio.gather(context.fetch_json(url, {"offset": 0}), context.fetch_json(url, {"offset": 5}))
+
+    assert len(nocodb.requests) == 2
+
+
+async def test_cancelling_first_caller_does_not_cancel_waiters(nocodb, context):
+    nocodb.delay = 0.05
+    url = context.data_url / "p1" / "t1"
+
+    owner = asyncio.create_task(context.fetch_json(url))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(context.fetch_json(url))
+    await asyncio.sleep(0)
+    owner.cancel()
+
+    result = await waiter
+    assert result["list"] == ROWS[:25]
+    assert owner.cancelled()
+    assert len(nocodb.requests) == 1
+
+
+async def test_errors_reach_every_caller(nocodb, context):
+    nocodb.delay = 0.05
+    nocodb.fail_offsets = {0}
+    url = context.data_url / "p1" / "t1"
+
+    results = await asyncio.gather(*(context.fetch_json(url) for _ in range(3)), return_exceptions=True)
+
+    assert len(nocodb.requests) == 1
+    assert all(isinstance(result, aiohttp.ClientResponseError) for result in results)
+    assert context.inflight_requests == {}
+
+
+async def test_write_tools_send_and_decode_json(nocodb, context):
+    result = json.loads(await server.nocodb_update_record(tool_context(context), "p1", "t1", "7", {"Title": "x"}))
+
+    assert result["success"] is True
+    assert result["record"] == {"Title": "x"}
+    assert [(method, str(url), body) for method, url, body in nocodb.requests] == [
+        ("PATCH", "/api/v1/db/data/noco/p1/t1/7", {"Title": "x"}),
+    ]
+
+
+async def test_delete_record_ignores_non_json_body(nocodb, context):
+    result = json.loads(await server.nocodb_delete_record(tool_context(context), "p1", "t1", "7"))
+
+    assert result["success"] is True
+    method, url, _ = nocodb.requests[0]
+    assert (method, str(url)) == ("DELETE", "/api/v1/db/data/noco/p1/t1/7")
+
+
+@pytest.mark.parametrize(
+    ("tool", "method"),
+    [
+        (server.nocodb_bulk_create_records, "POST"),
+        (server.nocodb_bulk_update_records, "PATCH"),
+        (server.nocodb_bulk_delete_records, "DELETE"),
+    ],
+)
+async def test_bulk_tools_send_one_request_per_batch(nocodb, context, tool, method):
+    records = [{"Id": 1, "Title": "a"}, {"Id": 2, "Title": "b"}]
+
+    result = json.loads(await tool(tool_context(context), "p1", "t1", records))
+
+    assert result["success"] is True
+    assert result["count"] == 2
+    assert [(m, str(url), body) for m, url, body in nocodb.requests] == [
+        (method, "/api/v1/db/data/bulk/noco/p1/t1", records),
+    ]
+
+
+CUTOFF = datetime(2026, 1, 2, tzinfo=UTC).timestamp()
+
+
+@pytest.mark.parametrize(
+    ("timestamp", "recent"),
+    [
+        ("2026-01-02T00:00:01.000Z", 1),
+        ("2026-01-01T23:59:59.000Z", 0),
+        ("2026-01-02T05:00:00+00:00", 1),
+        ("2026-01-02T01:00:00+02:00", 0),
+        ("2026-01-02 05:00:00", 1),
+        ("2026-01-01T23:00:00", 0),
+        (1767312000, 0),
+        ("not a date", 0),
+        (None, 0),
+    ],
+)
+def test_aggregate_analytics_recent_cutoff(timestamp, recent):
+    analytics = server._aggregate_analytics([{"timestamp": timestamp}], CUTOFF)
+
+    assert analytics["recent_24h"] == recent
+
+
+def test_aggregate_analytics_counts():
+    records = [
+        {"image_url": "x", "cinematic": True, "shot_type": "wide", "sref_code": "s1"},
+        {"image_url": "", "anime": True, "shot_type": "wide"},
+        {"cinematic": False, "shot_type": "close"},
+    ]
+
+    assert server._aggregate_analytics(records, CUTOFF) == {
+        "total_reactions": 3,
+        "with_images": 1,
+        "cinematic_count": 1,
+        "anime_count": 1,
+        "with_sref_codes": 1,
+        "shot_types": {"wide": 2, "close": 1},
+        "recent_24h": 0,
+    }
+
+
+def test_encode_where_keeps_true_and_one_apart():
+    assert json.loads(server._encode_where({"cinematic": 1})) == {"cinematic": 1}
+    assert server._encode_where({"cinematic": True}) == '{"cinematic":true}'
+    assert server._encode_where({"cinematic": 1}) == '{"cinematic":1}'
+
+
+def test_encode_where_handles_unhashable_filters():
+    filters = {"tags": ["a", "b"], "meta": {"k": 1}}
+
+    assert json.loads(server._encode_where(filters)) == filters
+
+
+async def test_paging_follows_nocodb_page_size_cap(nocodb, context):
+    nocodb.max_page_size = 50
+    url = context.data_url / "p1" / "t1"
+
+    pages = [page async for page in server._iter_record_pages(context, url, "Id")]
+
+    assert sorted(row["Id"] for page in pages for row in page) == list(range(len(ROWS)))
+    assert [url.query["offset"] for _, url, _ in nocodb.requests] == ["0", "50", "100"]
+
+
+async def test_paging_raises_when_a_page_fails(nocodb, context):
+    nocodb.max_page_size = 20
+    nocodb.fail_offsets = {20, 40, 60}
+    url = context.data_url / "p1" / "t1"
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        async for _ in server._iter_record_pages(context, url, "Id"):
+            pass
+
+
+async def test_scan_analytics_merges_page_totals(nocodb, context):
+    nocodb.rows = [
+        {"image_url": "x" if i % 2 else "", "cinematic": i % 3 == 0, "shot_type": ["wide", "close", None][i % 3]}
+        for i in range(120)
+    ]
+    nocodb.max_page_size = 50
+
+    analytics = await server._scan_analytics(context, context.data_url / "p1" / "t1")
+
+    assert analytics == server._aggregate_analytics(nocodb.rows, CUTOFF)
+    assert analytics["total_reactions"] == 120
+    assert analytics["shot_types"] == {"wide": 40, "close": 40}
+
+
+async def test_scan_analytics_stops_paging_when_aggregation_fails(nocodb, context):
+    # Rows past the first page cannot be tallied, so aggregating the second page raises
+    nocodb.rows = [{"shot_type": "wide"}] * 10 + [{"shot_type": ["unhashable"]}] * 190
+    nocodb.max_page_size = 10
+    nocodb.delay = 0.02
+
+    # Holding the traceback keeps the scan's frames alive, as a caller retaining the error would
+    with pytest.raises(TypeError) as excinfo:
+        await server._scan_analytics(context, context.data_url / "p1" / "t1")
+    await asyncio.sleep(0.2)
+
+    # Requests already in flight finish, but the remaining pages are never fetched
+    assert len(nocodb.requests) < len(nocodb.rows) // nocodb.max_page_size
+    assert excinfo.type is TypeError
+
+
+def hours_ago(hours: float) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(time.time() - hours * 60 * 60))
+
+
+def count_requests(nocodb: MockNocoDB) -> int:
+    return sum(url.path.endswith("/count") for _, url, _ in nocodb.requests)
+
+
+async def get_analytics(context: NocoDBContext, **kwargs) -> dict:
+    return json.loads(await server.nocodb_get_analytics(tool_context(context), "p1", "t1", **kwargs))
+
+
+async def test_server_analytics_queries(nocodb, context):
+    nocodb.rows = [{"timestamp": hours_ago(1)}, {"timestamp": hours_ago(30)}, {"timestamp": hours_ago(100)}]
+
+    result = await get_analytics(context, mode="server")
+
+    since = time.strftime("%Y-%m-%d", time.gmtime(time.time() - 48 * 60 * 60))
+    assert result["analytics"]["recent_24h"] == 1
+    assert result["analytics"]["shot_types"] == {"wide": 2}
+    assert {url.query.get("where") for _, url, _ in nocodb.requests} == {
+        None,
+        "(image_url,notblank)",
+        "(cinematic,checked)",
+        "(anime,checked)",
+        "(sref_code,notblank)",
+        f"(timestamp,gte,exactDate,{since})",
+    }
+    assert any(
+        url.path.endswith("/groupby") and url.query["column_name"] == "shot_type" for _, url, _ in nocodb.requests
+    )
+
+
+async def test_server_analytics_remembers_rejected_filters(nocodb, context):
+    nocodb.rows = [{"timestamp": hours_ago(1)}] * 3
+    nocodb.count_status = 400
+
+    result = await get_analytics(context, mode="server")
+    assert result["analytics"]["total_reactions"] == 3
+    assert result["analytics"]["recent_24h"] == 3
+    assert count_requests(nocodb) == 5
+
+    context.analytics_cache.invalidate((context.data_url / "p1" / "t1", "server"))
+    await get_analytics(context, mode="server")
+    assert count_requests(nocodb) == 5
+
+    await get_analytics(context, mode="server", refresh=True)
+    assert count_requests(nocodb) == 10
+
+
+async def test_server_analytics_retries_after_auth_errors(nocodb, context):
+    nocodb.rows = [{"timestamp": hours_ago(1)}]
+    nocodb.count_status = 401
+
+    await get_analytics(context, mode="server")
+    context.analytics_cache.invalidate((context.data_url / "p1" / "t1", "server"))
+    await get_analytics(context, mode="server")
+
+    assert count_requests(nocodb) == 10